@@ -1,10 +1,13 @@
-import json
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import orjson
 import customtkinter as ctk
 from tkinter import messagebox
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.styles import getSampleStyleSheet
@@ -15,8 +18,14 @@ from reportlab.lib.enums import TA_CENTER
 # ==================================================
 class Ingrediente:
     """Classe para representar um ingrediente com suas informações nutricionais"""
+    __slots__ = ('nome', 'carboidrato_por_g', 'proteina_por_g', 'gordura_por_g', 'fibra_por_g', 'sodio_por_g')
+    
     def __init__(self, nome, carboidrato_por_g, proteina_por_g, gordura_por_g, fibra_por_g, sodio_por_g):
-        self.nome = nome
+        self.atualizar(nome, carboidrato_por_g, proteina_por_g, gordura_por_g, fibra_por_g, sodio_por_g)
+    
+    def atualizar(self, nome, carboidrato_por_g, proteina_por_g, gordura_por_g, fibra_por_g, sodio_por_g):
+        """Altera todos os dados do ingrediente de uma vez"""
+        self.nome = sys.intern(nome)  # Nomes iguais viram o mesmo objeto: comparações e buscas mais baratas
         self.carboidrato_por_g = carboidrato_por_g
         self.proteina_por_g = proteina_por_g
         self.gordura_por_g = gordura_por_g
@@ -36,11 +45,32 @@ class Ingrediente:
 
 class Receita:
     """Classe para representar uma receita com múltiplos ingredientes"""
+    __slots__ = ('nome', '_ingredientes', 'rendimento_total', '_nutrientes')
+    
     def __init__(self, nome, ingredientes, rendimento_total):
         self.nome = nome
         self.ingredientes = ingredientes  # Lista de tuplas (Ingrediente, quantidade em gramas)
         self.rendimento_total = rendimento_total  # Gramas totais da receita final
     
+    @property
+    def ingredientes(self):
+        return self._ingredientes
+    
+    @ingredientes.setter
+    def ingredientes(self, ingredientes):
+        self._ingredientes = ingredientes
+        self._nutrientes = None
+    
+    def nutrientes_totais(self):
+        """Soma dos nutrientes da receita inteira, calculada uma vez e reaproveitada"""
+        if self._nutrientes is None:
+            self._nutrientes = CalculadoraNutricional._somar_nutrientes(self._ingredientes)
+        return self._nutrientes
+    
+    def invalidar_cache(self):
+        """Descarta a soma em cache (ex.: quando um ingrediente da receita é editado)"""
+        self._nutrientes = None
+    
     def to_dict(self):
         return {
             'nome': self.nome,
@@ -55,60 +85,119 @@ class DataManager:
     """Classe para gerenciar o carregamento e salvamento de dados"""
     INGREDIENTES_FILE = 'ingredientes.json'
     RECEITAS_FILE = 'receitas.json'
+    JSON_INDENTADO = False  # True grava os arquivos indentados, útil para depuração
+    
+    # Cache em memória, invalidado quando o mtime do arquivo muda
+    _ingredientes_cache = None
+    _ingredientes_mtime = None
+    _receitas_cache = None
+    _receitas_mtime = None
+    _receitas_base = None  # Índice de ingredientes usado para montar o cache de receitas
+    
+    @staticmethod
+    def _mtime(caminho):
+        """Retorna o mtime do arquivo em nanossegundos, ou None se ele não existir"""
+        try:
+            return os.stat(caminho).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _ler_json(caminho):
+        """Lê e decodifica um arquivo JSON em modo binário"""
+        with open(caminho, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    @classmethod
+    def _escrever_json(cls, caminho, dados):
+        """Serializa os dados e grava o arquivo JSON em modo binário"""
+        opcoes = orjson.OPT_INDENT_2 if cls.JSON_INDENTADO else 0
+        # Grava num temporário e troca de uma vez: uma falha no meio não corrompe o arquivo
+        temporario = caminho + '.tmp'
+        try:
+            with open(temporario, 'wb') as f:
+                f.write(orjson.dumps(dados, option=opcoes))
+            os.replace(temporario, caminho)
+        finally:
+            # Após o os.replace o temporário já não existe; só sobra se a gravação falhou
+            if os.path.exists(temporario):
+                os.remove(temporario)
+    
+    @classmethod
+    def gravar_dados(cls, caminho, dados):
+        """Grava dados já serializados sem tocar nos caches, podendo rodar fora da thread da interface.
+        O mtime do arquivo muda, então a próxima carga volta a lê-lo"""
+        cls._escrever_json(caminho, dados)
+    
+    @staticmethod
+    def serializar(itens):
+        """Converte ingredientes ou receitas nos dicionários gravados em JSON"""
+        return [item.to_dict() for item in itens]
+    
+    @staticmethod
+    def indexar_por_nome(itens):
+        """Monta um dicionário {nome: item} para buscas O(1) por nome"""
+        return {item.nome: item for item in itens}
     
     @classmethod
     def carregar_ingredientes(cls):
         """Carrega ingredientes do arquivo JSON"""
-        if not os.path.exists(cls.INGREDIENTES_FILE):
+        mtime = cls._mtime(cls.INGREDIENTES_FILE)
+        if mtime is None:
             return []
+        if cls._ingredientes_cache is not None and mtime == cls._ingredientes_mtime:
+            return cls._ingredientes_cache
         
-        with open(cls.INGREDIENTES_FILE, 'r') as f:
-            dados = json.load(f)
-        
-        ingredientes = []
-        for item in dados:
-            # Usar get() com valor padrão para compatibilidade com versões antigas
-            ingredientes.append(
-                Ingrediente(
-                    nome=item['nome'],
-                    carboidrato_por_g=item['carboidrato_por_g'],
-                    proteina_por_g=item['proteina_por_g'],
-                    gordura_por_g=item['gordura_por_g'],
-                    fibra_por_g=item['fibra_por_g'],
-                    sodio_por_g=item['sodio_por_g']
-                )
-            )
+        # As chaves do arquivo são os próprios parâmetros de Ingrediente (ver to_dict)
+        ingredientes = [Ingrediente(**item) for item in cls._ler_json(cls.INGREDIENTES_FILE)]
+        
+        cls._ingredientes_cache = ingredientes
+        cls._ingredientes_mtime = mtime
         return ingredientes
     
     @classmethod
     def salvar_ingredientes(cls, ingredientes):
         """Salva lista de ingredientes no arquivo JSON"""
-        with open(cls.INGREDIENTES_FILE, 'w') as f:
-            json.dump([i.to_dict() for i in ingredientes], f, indent=4)
+        cls._escrever_json(cls.INGREDIENTES_FILE, cls.serializar(ingredientes))
+        cls._ingredientes_cache = ingredientes
+        cls._ingredientes_mtime = cls._mtime(cls.INGREDIENTES_FILE)
     
     @classmethod
-    def carregar_receitas(cls, ingredientes):
+    def carregar_receitas(cls, ingredientes_por_nome):
+        """Carrega receitas do arquivo JSON, resolvendo os ingredientes pelo índice {nome: Ingrediente}"""
         try:
-            if not os.path.exists(cls.RECEITAS_FILE):
+            mtime = cls._mtime(cls.RECEITAS_FILE)
+            if mtime is None:
                 return []
+            # Mesmos nomes apontando para os mesmos objetos: o cache continua válido
+            if (cls._receitas_cache is not None and mtime == cls._receitas_mtime
+                    and ingredientes_por_nome == cls._receitas_base):
+                return cls._receitas_cache
             
-            with open(cls.RECEITAS_FILE, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
+            dados = cls._ler_json(cls.RECEITAS_FILE)
                 
             receitas = []
             for item in dados:
                 ingredientes_receita = []
                 for nome_ing, qtd in item['ingredientes']:
-                    ingrediente = next((i for i in ingredientes if i.nome == nome_ing), None)
+                    ingrediente = ingredientes_por_nome.get(nome_ing)
                     if ingrediente:
                         ingredientes_receita.append((ingrediente, qtd))
                 
+                # Soma das quantidades só é calculada quando o arquivo não traz o rendimento
+                rendimento_total = item.get('rendimento_total')
+                if rendimento_total is None:
+                    rendimento_total = sum(qtd for _, qtd in ingredientes_receita)
+                
                 receitas.append(Receita(
                     item['nome'],
                     ingredientes_receita,
-                    item.get('rendimento_total', sum(qtd for _, qtd in ingredientes_receita))
+                    rendimento_total
                 ))
-                
+            
+            cls._receitas_cache = receitas
+            cls._receitas_mtime = mtime
+            cls._receitas_base = ingredientes_por_nome
             return receitas
             
         except Exception as e:
@@ -117,32 +206,52 @@ class DataManager:
         
     @classmethod
     def salvar_receitas(cls, receitas):
-        try:
-            dados = [{
-                'nome': r.nome,
-                'ingredientes': [(ing.nome, qtd) for ing, qtd in r.ingredientes],
-                'rendimento_total': r.rendimento_total
-            } for r in receitas]
-            
-            with open(cls.RECEITAS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, indent=4, ensure_ascii=False)
-                
-        except Exception as e:
-            messagebox.showerror("Erro", f"Falha ao salvar receitas: {str(e)}")
+        """Salva lista de receitas no arquivo JSON"""
+        cls._escrever_json(cls.RECEITAS_FILE, cls.serializar(receitas))
+        
+        # Só mantém o cache se a lista salva for a mesma que está em cache
+        if receitas is cls._receitas_cache:
+            cls._receitas_mtime = cls._mtime(cls.RECEITAS_FILE)
+        else:
+            cls._receitas_cache = None
 
     @classmethod
-    def deletar_ingrediente(cls, nome):
-        ingredientes = cls.carregar_ingredientes()
-        ingredientes = [i for i in ingredientes if i.nome != nome]
+    def deletar_ingredientes(cls, nomes):
+        """Remove de uma só vez todos os ingredientes cujos nomes estão em `nomes`"""
+        nomes = set(nomes)
+        # Monta uma nova lista: a carregada pode ser a mesma que outro código (ex.: a interface) usa
+        ingredientes = [i for i in cls.carregar_ingredientes() if i.nome not in nomes]
         cls.salvar_ingredientes(ingredientes)
     
     @classmethod
-    def deletar_receita(cls, nome):
-        receitas = cls.carregar_receitas()
-        receitas = [r for r in receitas if r.nome != nome]
+    def deletar_ingrediente(cls, nome):
+        cls.deletar_ingredientes({nome})
+    
+    @classmethod
+    def deletar_receitas(cls, nomes):
+        """Remove de uma só vez todas as receitas cujos nomes estão em `nomes`"""
+        nomes = set(nomes)
+        receitas = cls.carregar_receitas(cls.indexar_por_nome(cls.carregar_ingredientes()))
+        receitas = [r for r in receitas if r.nome not in nomes]
         cls.salvar_receitas(receitas)
+    
+    @classmethod
+    def deletar_receita(cls, nome):
+        cls.deletar_receitas({nome})
 
 class CalculadoraNutricional:
+    @staticmethod
+    def _somar_nutrientes(ingredientes):
+        """Soma (carboidrato, proteína, gordura, fibra, sódio) de uma lista de (Ingrediente, quantidade)"""
+        carb = prot = gord = fibra = sodio = 0.0
+        for ingrediente, qtd in ingredientes:
+            carb += qtd * ingrediente.carboidrato_por_g
+            prot += qtd * ingrediente.proteina_por_g
+            gord += qtd * ingrediente.gordura_por_g
+            fibra += qtd * ingrediente.fibra_por_g
+            sodio += qtd * ingrediente.sodio_por_g
+        return carb, prot, gord, fibra, sodio
+    
     @staticmethod
     def calcular_por_porcao(receitas_porcoes):
         totais = {
@@ -160,29 +269,33 @@ class CalculadoraNutricional:
             
             fator = porcao / receita.rendimento_total  # Fator baseado no rendimento total
             
-            for ingrediente, qtd in receita.ingredientes:
-                quantidade_efetiva = qtd * fator
-                totais['carboidratos'] += quantidade_efetiva * ingrediente.carboidrato_por_g
-                totais['proteina'] += quantidade_efetiva * ingrediente.proteina_por_g
-                totais['gordura'] += quantidade_efetiva * ingrediente.gordura_por_g
-                totais['calorias'] += (quantidade_efetiva * ingrediente.carboidrato_por_g * 4 +
-                                      quantidade_efetiva * ingrediente.proteina_por_g * 4 +
-                                      quantidade_efetiva * ingrediente.gordura_por_g * 9)
-                totais['fibra'] += quantidade_efetiva * ingrediente.fibra_por_g
-                totais['sodio'] += quantidade_efetiva * ingrediente.sodio_por_g
+            # Somar a receita inteira e aplicar o fator uma única vez
+            carb, prot, gord, fibra, sodio = receita.nutrientes_totais()
+            
+            totais['carboidratos'] += carb * fator
+            totais['proteina'] += prot * fator
+            totais['gordura'] += gord * fator
+            totais['fibra'] += fibra * fator
+            totais['sodio'] += sodio * fator
+        
+        # Calorias derivadas uma única vez dos macronutrientes totais (4/4/9 kcal por g)
+        totais['calorias'] = totais['carboidratos'] * 4 + totais['proteina'] * 4 + totais['gordura'] * 9
                 
         return {k: round(v, 2) for k, v in totais.items()}
 
 class ValoresDiarios:
     VD_FILE = 'valores_diarios.json'
+    _cache = None
     
     @classmethod
     def carregar(cls):
+        if cls._cache is not None:
+            return cls._cache
+        
         try:
-            with open(cls.VD_FILE, 'r') as f:
-                return json.load(f)
+            cls._cache = DataManager._ler_json(cls.VD_FILE)
         except FileNotFoundError:
-            return {
+            cls._cache = {
                 "carboidratos": 300,
                 "proteinas": 75,
                 "gorduras_totais": 55,
@@ -190,47 +303,92 @@ class ValoresDiarios:
                 "fibras": 30,
                 "sodio": 5000
             }
+        return cls._cache
     
     @classmethod
     def salvar(cls, dados):
-        with open(cls.VD_FILE, 'w') as f:
-            json.dump(dados, f, indent=4)
+        # Mesma gravação atômica e mesma formatação (JSON_INDENTADO) dos demais arquivos
+        DataManager._escrever_json(cls.VD_FILE, dados)
+        cls._cache = dados
+    
+    @classmethod
+    def invalidar(cls):
+        """Descarta o cache para que a próxima leitura volte ao arquivo (ex.: após edição externa)"""
+        cls._cache = None
 
 class GeradorPDF:
+    # Estilos criados uma única vez e reaproveitados em todos os PDFs
+    _ESTILOS = getSampleStyleSheet()
+    _ESTILO_CABECALHO = ParagraphStyle(
+        name='Cabecalho',
+        parent=_ESTILOS["BodyText"],
+        alignment=TA_CENTER
+    )
+    _ESTILO_RODAPE = ParagraphStyle(
+        name='Italic',
+        parent=_ESTILOS["Italic"],
+        fontSize=8,
+        leading=10
+    )
+    _ESTILO_TABELA = TableStyle([
+        ('SPAN', (0,0), (-1,0)),  # Mesclar linha do cabeçalho
+        ('SPAN', (0,8), (-1,8)), # Mesclar linha do rodapé
+        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+        ('BACKGROUND', (0,1), (-1,1), colors.beige),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 12),
+        ('FONTSIZE', (0,1), (-1,-1), 10),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ALIGN', (0,8), (-1,8), 'LEFT'),
+        ('FONTNAME', (0,8), (-1,8), 'Helvetica'),
+        ('TEXTCOLOR', (0,8), (-1,8), colors.dimgray),
+    ])
+    # Pares (chave em dados_nutricionais, chave em valores diários) usados no %VD
+    _REFERENCIAS_VD = (
+        ('carboidratos', 'carboidratos'),
+        ('proteina', 'proteinas'),
+        ('gordura', 'gorduras_totais'),
+        ('calorias', 'valor_energetico'),
+        ('fibra', 'fibras'),
+        ('sodio', 'sodio'),
+    )
+    
     @staticmethod
     def gerar_tabela_nutricional(nome_arquivo, dados_nutricionais, peso_porcao):
+        GeradorPDF.gerar_lote(nome_arquivo, [(dados_nutricionais, peso_porcao)])
+    
+    @staticmethod
+    def gerar_lote(nome_arquivo, lista_dados):
+        """Gera um único PDF com uma tabela por página a partir de uma lista de (dados_nutricionais, peso_porcao)"""
         doc = SimpleDocTemplate(nome_arquivo, pagesize=letter)
-        elementos = []
-        
-        # Carregar valores diários
         vd = ValoresDiarios.carregar()
         
-        # Calcular valores energéticos
-        kcal = (dados_nutricionais['carboidratos'] * 4) + \
-               (dados_nutricionais['proteina'] * 4) + \
-               (dados_nutricionais['gordura'] * 9)
+        elementos = []
+        for dados_nutricionais, peso_porcao in lista_dados:
+            if elementos:
+                elementos.append(PageBreak())
+            elementos.append(GeradorPDF._montar_tabela(dados_nutricionais, peso_porcao, vd))
+        
+        doc.build(elementos)
+    
+    @staticmethod
+    def _montar_tabela(dados_nutricionais, peso_porcao, vd):
+        """Monta a tabela nutricional de uma marmita"""
+        # Valor energético já vem calculado pela CalculadoraNutricional
+        kcal = dados_nutricionais['calorias']
         kj = kcal * 4.184
 
         # Calcular porcentagens
         porcentagens = {
-            'carboidratos': (dados_nutricionais['carboidratos'] / vd['carboidratos']) * 100,
-            'proteina': (dados_nutricionais['proteina'] / vd['proteinas']) * 100,
-            'gordura': (dados_nutricionais['gordura'] / vd['gorduras_totais']) * 100,
-            'kcal': (kcal / vd['valor_energetico']) * 100,
-            'fibra': (dados_nutricionais['fibra'] / vd['fibras']) * 100,
-            'sodio': (dados_nutricionais['sodio'] / vd['sodio']) * 100
+            chave: dados_nutricionais[chave] / vd[chave_vd] * 100
+            for chave, chave_vd in GeradorPDF._REFERENCIAS_VD
         }
 
         # Estilos
-        styles = getSampleStyleSheet()
-        estilo_cabecalho = styles["BodyText"]
-        estilo_cabecalho.alignment = TA_CENTER
-        estilo_rodape = ParagraphStyle(
-            name='Italic',
-            parent=styles["Italic"],
-            fontSize=8,
-            leading=10
-        )
+        estilo_cabecalho = GeradorPDF._ESTILO_CABECALHO
+        estilo_rodape = GeradorPDF._ESTILO_RODAPE
         
         texto_rodape = (
             "*% Valores Diários de referência com base em uma dieta de {} kcal ou {} kJ. "
@@ -242,7 +400,7 @@ class GeradorPDF:
         tabela_dados = [
             [Paragraph("<b>INFORMAÇÃO NUTRICIONAL</b><br/>Marmita de {}g".format(peso_porcao), estilo_cabecalho), '', ''],
             ["", "Quantidade nesta marmita", "%VD*"],
-            ["Valor Energético", f"{kcal:.1f} kcal = {kj:.0f} kJ", f"{porcentagens['kcal']:.1f}%"],
+            ["Valor Energético", f"{kcal:.1f} kcal = {kj:.0f} kJ", f"{porcentagens['calorias']:.1f}%"],
             ["Carboidratos", f"{dados_nutricionais['carboidratos']:.1f} g", f"{porcentagens['carboidratos']:.1f}%"],
             ["Proteínas", f"{dados_nutricionais['proteina']:.1f} g", f"{porcentagens['proteina']:.1f}%"],
             ["Gorduras Totais", f"{dados_nutricionais['gordura']:.1f} g", f"{porcentagens['gordura']:.1f}%"],
@@ -251,45 +409,70 @@ class GeradorPDF:
             [Paragraph(texto_rodape, estilo_rodape), '', '']
         ]
 
-        # Estilo da tabela
-        estilo = TableStyle([
-            ('SPAN', (0,0), (-1,0)),  # Mesclar linha do cabeçalho
-            ('SPAN', (0,8), (-1,8)), # Mesclar linha do rodapé
-            ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-            ('BACKGROUND', (0,1), (-1,1), colors.beige),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTNAME', (0,0), (-1,1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 12),
-            ('FONTSIZE', (0,1), (-1,-1), 10),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('ALIGN', (0,8), (-1,8), 'LEFT'),
-            ('FONTNAME', (0,8), (-1,8), 'Helvetica'),
-            ('TEXTCOLOR', (0,8), (-1,8), colors.dimgray),
-        ])
-
         # Criar e formatar tabela
         tabela = Table(tabela_dados, colWidths=[120, 140, 50])
-        tabela.setStyle(estilo)
-        elementos.append(tabela)
-
-        doc.build(elementos)
+        tabela.setStyle(GeradorPDF._ESTILO_TABELA)
+        return tabela
 
 # ==================================================
 # FRONTEND (Interface gráfica)
 # ==================================================
 class NutritionApp(ctk.CTk):
+    # (rótulo, atributo do campo, chave em valores_diarios.json)
+    _CAMPOS_CONFIG = (
+        ("Carboidratos (g):", 'vd_carb', 'carboidratos'),
+        ("Proteínas (g):", 'vd_prot', 'proteinas'),
+        ("Gorduras Totais (g):", 'vd_gord', 'gorduras_totais'),
+        ("Fibras Alimentares (g):", 'vd_fibra', 'fibras'),
+        ("Sódio (mg):", 'vd_sodio', 'sodio'),
+        ("Valor Energético (kcal):", 'vd_kcal', 'valor_energetico')
+    )
+    # (rótulo, atributo do campo)
+    _CAMPOS_INGREDIENTE = (
+        ("Nome", 'entry_nome'),
+        ("Carboidratos por g", 'entry_carb'),
+        ("Proteínas por g", 'entry_prot'),
+        ("Gorduras por g", 'entry_gord'),
+        ("Fibras por g", 'entry_fibra'),
+        ("Sódio por mg", 'entry_sodio')
+    )
+    
     def __init__(self):
         super().__init__()
         self.title("Sistema Nutricional - Restaurante")
         self.geometry("800x600")
         
         # Carregar dados
+        # Índices por nome para buscas O(1); mantidos a cada inclusão, renomeação e exclusão
         self.ingredientes = DataManager.carregar_ingredientes() or []
-        self.receitas = DataManager.carregar_receitas(self.ingredientes) or []  # Correção aqui
+        self._ingredientes_por_nome = DataManager.indexar_por_nome(self.ingredientes)
+        self.receitas = DataManager.carregar_receitas(self._ingredientes_por_nome) or []
+        self._receitas_por_nome = DataManager.indexar_por_nome(self.receitas)
+        
+        # Índice reverso Ingrediente -> receitas que o usam
+        self._receitas_por_ingrediente = {}
+        for receita in self.receitas:
+            self._indexar_receita(receita)
+        
+        # Últimos nomes enviados aos combos, para pular reconfigurações sem mudança
+        self._nomes_ingredientes = tuple(self._ingredientes_por_nome)
+        self._nomes_receitas = tuple(self._receitas_por_nome)
+        
+        # Coleções alteradas desde a última gravação em disco
+        self._ingredientes_alterados = False
+        self._receitas_alteradas = False
+        
+        # Gravação em disco numa thread única; pedidos feitos enquanto uma está na fila são agrupados
+        self._executor_gravacao = ThreadPoolExecutor(max_workers=1)
+        self._trava_gravacao = threading.Lock()
+        self._gravacao_pendente = {}  # Arquivo -> dados já serializados aguardando gravação
+        self._gravacao_agendada = False
+        self._gravacoes = set()  # Gravações cujo resultado ainda não foi verificado
+        self.protocol("WM_DELETE_WINDOW", self._fechar)
         
         self.ingrediente_selecionado = None
         self.receita_selecionada = None
+        self._itens_receita = []  # (Ingrediente, quantidade) da receita em edição; a caixa de texto só exibe
 
         # Criar abas
         self.tabview = ctk.CTkTabview(self)
@@ -311,30 +494,15 @@ class NutritionApp(ctk.CTk):
         frame = ctk.CTkFrame(self.tab_config)
         frame.pack(pady=20, padx=20, fill='both', expand=True)
 
-        campos = [
-            ("Carboidratos (g):", 'vd_carb'),
-            ("Proteínas (g):", 'vd_prot'),
-            ("Gorduras Totais (g):", 'vd_gord'),
-            ("Fibras Alimentares (g):", 'vd_fibra'),
-            ("Sódio (mg):", 'vd_sodio'),
-            ("Valor Energético (kcal):", 'vd_kcal')
-        ]
-
-        for i, (label, attr) in enumerate(campos):
+        # Criar campos já preenchidos com os valores atuais
+        vd = ValoresDiarios.carregar()
+        for i, (label, attr, chave) in enumerate(self._CAMPOS_CONFIG):
             ctk.CTkLabel(frame, text=label).grid(row=i, column=0, padx=5, pady=5, sticky='w')
             entry = ctk.CTkEntry(frame)
             entry.grid(row=i, column=1, padx=5, pady=5)
+            entry.insert(0, str(vd[chave]))
             setattr(self, attr, entry)
 
-        # Carregar valores atuais
-        vd = ValoresDiarios.carregar()
-        self.vd_carb.insert(0, str(vd['carboidratos']))
-        self.vd_prot.insert(0, str(vd['proteinas']))
-        self.vd_gord.insert(0, str(vd['gorduras_totais']))
-        self.vd_fibra.insert(0, str(vd['fibras']))
-        self.vd_sodio.insert(0, str(vd['sodio']))
-        self.vd_kcal.insert(0, str(vd['valor_energetico']))
-
         btn_salvar = ctk.CTkButton(
             frame,
             text="Salvar Valores Diários",
@@ -345,12 +513,8 @@ class NutritionApp(ctk.CTk):
     def _salvar_vds(self):
         try:
             novos_vd = {
-                "carboidratos": float(self.vd_carb.get()),
-                "proteinas": float(self.vd_prot.get()),
-                "gorduras_totais": float(self.vd_gord.get()),
-                "fibras_alimentares": float(self.vd_fibra.get()),
-                "sodio": float(self.vd_sodio.get()),
-                "valor_energetico": float(self.vd_kcal.get())
+                chave: float(getattr(self, attr).get())
+                for _, attr, chave in self._CAMPOS_CONFIG
             }
             ValoresDiarios.salvar(novos_vd)
             messagebox.showinfo("Sucesso", "Valores atualizados!")
@@ -397,16 +561,7 @@ class NutritionApp(ctk.CTk):
         btn_deletar.pack(side='left', padx=5)
         
         # Campos do formulário
-        campos = [
-            ("Nome", 'entry_nome'),
-            ("Carboidratos por g", 'entry_carb'),
-            ("Proteínas por g", 'entry_prot'),
-            ("Gorduras por g", 'entry_gord'),
-            ("Fibras por g", 'entry_fibra'),
-            ("Sódio por mg", 'entry_sodio')
-        ]
-        
-        for i, (label, attr) in enumerate(campos, start=1):
+        for i, (label, attr) in enumerate(self._CAMPOS_INGREDIENTE, start=1):
             ctk.CTkLabel(frame_form, text=label).grid(row=i, column=0, padx=5, pady=5)
             entry = ctk.CTkEntry(frame_form)
             entry.grid(row=i, column=1, padx=5, pady=5)
@@ -425,85 +580,55 @@ class NutritionApp(ctk.CTk):
         if not nome:
             return
         
-        ingrediente = next((i for i in self.ingredientes if i.nome == nome), None)
+        ingrediente = self._ingredientes_por_nome.get(nome)
         if not ingrediente:
             return
         
         self.ingrediente_selecionado = ingrediente
         
         # Preencher campos do formulário
-        self.entry_nome.delete(0, 'end')
-        self.entry_nome.insert(0, ingrediente.nome)
-        self.entry_carb.delete(0, 'end')
-        self.entry_carb.insert(0, str(ingrediente.carboidrato_por_g))
-        self.entry_prot.delete(0, 'end')
-        self.entry_prot.insert(0, str(ingrediente.proteina_por_g))
-        self.entry_gord.delete(0, 'end')
-        self.entry_gord.insert(0, str(ingrediente.gordura_por_g))
-        self.entry_fibra.delete(0, 'end')
-        self.entry_fibra.insert(0, str(ingrediente.fibra_por_g))
-        self.entry_sodio.delete(0, 'end')
-        self.entry_sodio.insert(0, str(ingrediente.sodio_por_g))
+        for entry, valor in (
+            (self.entry_nome, ingrediente.nome),
+            (self.entry_carb, ingrediente.carboidrato_por_g),
+            (self.entry_prot, ingrediente.proteina_por_g),
+            (self.entry_gord, ingrediente.gordura_por_g),
+            (self.entry_fibra, ingrediente.fibra_por_g),
+            (self.entry_sodio, ingrediente.sodio_por_g)
+        ):
+            self._definir_entry(entry, valor)
 
     def _novo_ingrediente(self):
         self.ingrediente_selecionado = None
         self.combo_ingredientes_exist.set('')
-        self.entry_nome.delete(0, 'end')
-        self.entry_carb.delete(0, 'end')
-        self.entry_prot.delete(0, 'end')
-        self.entry_gord.delete(0, 'end')
-        self.entry_fibra.delete(0, 'end')
-        self.entry_sodio.delete(0, 'end')
+        for _, attr in self._CAMPOS_INGREDIENTE:
+            getattr(self, attr).delete(0, 'end')
 
-    def salvar_ingrediente(self):
-        try:
-            nome = self.entry_nome.get()
-            carb = float(self.entry_carb.get())
-            prot = float(self.entry_prot.get())
-            gord = float(self.entry_gord.get())
-            fibra = float(self.entry_fibra.get() or 0.0)
-            sodio = float(self.entry_sodio.get() or 0.0)
-        except ValueError:
-            messagebox.showerror("Erro", "Preencha todos os campos corretamente")
-            return
-
-        if self.ingrediente_selecionado:
-            # Modo edição
-            ingrediente = self.ingrediente_selecionado
-            old_name = ingrediente.nome
-            
-            # Atualizar dados
-            ingrediente.nome = nome
-            ingrediente.carboidrato_por_g = carb
-            ingrediente.proteina_por_g = prot
-            ingrediente.gordura_por_g = gord
-            
-            # Atualizar combos
-            if old_name != nome:
-                self._atualizar_combos_ingredientes(old_name, nome)
-        else:
-            # Modo novo ingrediente
-            novo_ing = Ingrediente(nome, carb, prot, gord, fibra, sodio)
-            self.ingredientes.append(novo_ing)
-            
-        DataManager.salvar_ingredientes(self.ingredientes)
-        self._atualizar_combos()
-        messagebox.showinfo("Sucesso", "Ingrediente salvo com sucesso!")
-        self._novo_ingrediente()
+    @staticmethod
+    def _definir_entry(entry, valor):
+        """Substitui o conteúdo de um campo de texto"""
+        entry.delete(0, 'end')
+        entry.insert(0, str(valor))
 
     def _atualizar_combos(self):
-        # Atualizar lista de ingredientes
-        valores = [i.nome for i in self.ingredientes]
+        # Atualizar lista de ingredientes (só se algum nome mudou)
+        nomes = tuple(i.nome for i in self.ingredientes)
+        if nomes == self._nomes_ingredientes:
+            return
+        self._nomes_ingredientes = nomes
+        
+        valores = list(nomes)
         self.combo_ingredientes_exist.configure(values=valores)
         self.combo_ingredientes.configure(values=valores)
 
-    def _atualizar_combos_ingredientes(self, old_name, new_name):
-        # Atualizar receitas que usam o ingrediente renomeado
-        for receita in self.receitas:
-            for i, (ing, qtd) in enumerate(receita.ingredientes):
-                if ing.nome == old_name:
-                    receita.ingredientes[i] = (self.ingrediente_selecionado, qtd)
-        DataManager.salvar_receitas(self.receitas)
+    def _indexar_receita(self, receita):
+        for ing, _ in receita.ingredientes:
+            self._receitas_por_ingrediente.setdefault(ing, set()).add(receita)
+
+    def _desindexar_receita(self, receita):
+        for ing, _ in receita.ingredientes:
+            receitas = self._receitas_por_ingrediente.get(ing)
+            if receitas:
+                receitas.discard(receita)
     
     def _criar_aba_receitas(self):
         # Frame principal
@@ -572,8 +697,15 @@ class NutritionApp(ctk.CTk):
         )
         btn_add.pack(side='left', padx=5)
 
+        btn_remover = ctk.CTkButton(
+            frame_ingredientes,
+            text="Remover",
+            command=self.remover_ingrediente_receita
+        )
+        btn_remover.pack(side='left', padx=5)
+
         # Lista de ingredientes ÚNICA COM PACK()
-        self.lista_ingredientes = ctk.CTkTextbox(frame_form, height=150)
+        self.lista_ingredientes = ctk.CTkTextbox(frame_form, height=150, state='disabled')
         self.lista_ingredientes.pack(fill='both', expand=True, pady=5)
 
         # Botão salvar
@@ -589,110 +721,48 @@ class NutritionApp(ctk.CTk):
         if not nome:
             return
         
-        receita = next((r for r in self.receitas if r.nome == nome), None)
+        receita = self._receitas_por_nome.get(nome)
         if not receita:
             return
         
         self.receita_selecionada = receita
         
         # Preencher campos do formulário
-        self.entry_nome_receita.delete(0, 'end')
-        self.entry_nome_receita.insert(0, receita.nome)
-        
-        # Preencher campo de rendimento total
-        self.entry_rendimento_total.delete(0, 'end')
-        self.entry_rendimento_total.insert(0, str(receita.rendimento_total))
+        self._definir_entry(self.entry_nome_receita, receita.nome)
+        self._definir_entry(self.entry_rendimento_total, receita.rendimento_total)
 
-        # Limpar e preencher ingredientes
-        self.lista_ingredientes.delete('1.0', 'end')
-        for ing, qtd in receita.ingredientes:
-            self.lista_ingredientes.insert('end', f"{ing.nome} - {qtd}g\n")
+        # Copiar e exibir ingredientes
+        self._itens_receita = list(receita.ingredientes)
+        self._exibir_itens_receita()
 
     def _nova_receita(self):
         self.receita_selecionada = None
         self.combo_receitas_exist.set('')
         self.entry_nome_receita.delete(0, 'end')
-        self.lista_ingredientes.delete('1.0', 'end')
+        self._itens_receita = []
+        self._exibir_itens_receita()
 
-    def salvar_receita(self):
-        try:
-            rendimento_total = float(self.entry_rendimento_total.get())
-            if rendimento_total <= 0:
-                raise ValueError
-        except ValueError:
-            messagebox.showerror("Erro", "Rendimento total deve ser um número positivo")
-            return
-        
-        # Validação básica
-        nome = self.entry_nome_receita.get()
-        ingredientes_texto = self.lista_ingredientes.get('1.0', 'end').strip()
+    def _exibir_itens_receita(self):
+        # A caixa fica desabilitada para edição; habilitar só para redesenhar
+        self.lista_ingredientes.configure(state='normal')
+        self.lista_ingredientes.delete('1.0', 'end')
+        for ing, qtd in self._itens_receita:
+            self.lista_ingredientes.insert('end', f"{ing.nome} - {qtd}g\n")
+        self.lista_ingredientes.configure(state='disabled')
 
-        if self.receita_selecionada:
-            # Modo edição - atualizar dados
-            index = self.receitas.index(self.receita_selecionada)
-            self.receitas[index] = Receita(nome, ingredientes, rendimento_total)
-        else:
-            # Modo nova receita
-            nova_receita = Receita(
-                nome=nome,
-                ingredientes=ingredientes,
-                rendimento_total=rendimento_total  
-            )
-            self.receitas.append(nova_receita)
-        
-        if not nome or not ingredientes_texto:
-            messagebox.showerror("Erro", "Preencha todos os campos")
+    def _atualizar_combos_receitas(self):
+        nomes = tuple(r.nome for r in self.receitas)
+        if nomes == self._nomes_receitas:
             return
+        self._nomes_receitas = nomes
         
-        # Processar ingredientes
-        ingredientes = []
-        for line in ingredientes_texto.split('\n'):
-            if not line:
-                continue
-            try:
-                nome_ing, resto = line.split(' - ')
-                quantidade = int(resto.replace('g', '').strip())
-                ingrediente = next(i for i in self.ingredientes if i.nome == nome_ing)
-                ingredientes.append((ingrediente, quantidade))
-            except Exception as e:
-                messagebox.showerror("Erro", f"Formato inválido na linha: {line}")
-                return
-        
-        if self.receita_selecionada:
-            # Modo edição - atualizar receita existente
-            old_name = self.receita_selecionada.nome
-            self.receita_selecionada.nome = nome
-            self.receita_selecionada.ingredientes = ingredientes
-            self.receita_selecionada.peso_total = sum(qtd for _, qtd in ingredientes)
-            
-            if old_name != nome:
-                # Atualizar combos
-                valores = [r.nome for r in self.receitas]
-                self.combo_receitas_exist.configure(values=valores)
-        else:
-            # Modo nova receita
-            if any(r.nome == nome for r in self.receitas):
-                messagebox.showerror("Erro", "Já existe uma receita com este nome!")
-                return
-            
-            nova_receita = Receita(nome, ingredientes)
-            self.receitas.append(nova_receita)
-        
-        DataManager.salvar_receitas(self.receitas)
-        self._atualizar_combos_receitas()
-        messagebox.showinfo("Sucesso", "Receita salva com sucesso!")
-        self._nova_receita()
-
-    def _atualizar_combos_receitas(self):
-        valores = [r.nome for r in self.receitas]
+        valores = list(nomes)
         self.combo_receitas_exist.configure(values=valores)
-        # Atualizar também o combo da aba de gerar PDF
-        for frame in self.frame_receitas.winfo_children():
-            for child in frame.winfo_children():
-                if isinstance(child, ctk.CTkComboBox):
-                    current_value = child.get()
-                    child.configure(values=valores)
-                    child.set(current_value)
+        # Atualizar também os combos da aba de gerar PDF
+        for combo, _ in self._linhas_porcao:
+            current_value = combo.get()
+            combo.configure(values=valores)
+            combo.set(current_value)
 
     def _criar_aba_gerar(self):
         frame = ctk.CTkFrame(self.tab_gerar)
@@ -702,6 +772,7 @@ class NutritionApp(ctk.CTk):
         ctk.CTkLabel(frame, text="Selecione as Receitas e Quantidades:").pack(pady=5)
         
         self.receitas_porcoes = []
+        self._linhas_porcao = []  # (combo, entry) de cada linha de receita/porção
         
         # Frame para adicionar receitas
         self.frame_receitas = ctk.CTkScrollableFrame(frame)
@@ -739,15 +810,22 @@ class NutritionApp(ctk.CTk):
         entry = ctk.CTkEntry(frame, width=100, placeholder_text="Gramas")
         entry.pack(side='left', padx=5)
         
+        linha = (combo, entry)
+        self._linhas_porcao.append(linha)
+        
         # Botão remover
         btn_remove = ctk.CTkButton(
             frame,
             text="X",
             width=30,
-            command=lambda f=frame: f.destroy()
+            command=lambda f=frame, l=linha: self._remover_receita_porcao(f, l)
         )
         btn_remove.pack(side='right', padx=5)
     
+    def _remover_receita_porcao(self, frame, linha):
+        self._linhas_porcao.remove(linha)
+        frame.destroy()
+    
     # ====================
     # Métodos de negócio
     # ====================
@@ -768,29 +846,46 @@ class NutritionApp(ctk.CTk):
             ingrediente = self.ingrediente_selecionado
             old_name = ingrediente.nome
             
+            # Nada mudou desde o "Carregar": evita regravar o arquivo e os combos
+            atuais = (old_name, ingrediente.carboidrato_por_g, ingrediente.proteina_por_g,
+                      ingrediente.gordura_por_g, ingrediente.fibra_por_g, ingrediente.sodio_por_g)
+            if (nome, carb, prot, gord, fibra, sodio) == atuais:
+                messagebox.showinfo("OK", "Sem alterações")
+                return
+            
+            if old_name != nome and nome in self._ingredientes_por_nome:
+                messagebox.showerror("Erro", "Já existe um ingrediente com este nome!")
+                return
+            
             # Atualizar dados do objeto existente
-            ingrediente.nome = nome
-            ingrediente.carboidrato_por_g = carb
-            ingrediente.proteina_por_g = prot
-            ingrediente.gordura_por_g = gord
-            ingrediente.fibra_por_g = fibra
-            ingrediente.sodio_por_g = sodio
+            ingrediente.atualizar(nome, carb, prot, gord, fibra, sodio)
             
-            # Atualizar combos se o nome mudou
+            # As densidades mudaram: descartar as somas em cache das receitas que o usam
+            receitas_afetadas = self._receitas_por_ingrediente.get(ingrediente, ())
+            for receita in receitas_afetadas:
+                receita.invalidar_cache()
+            
+            # Atualizar índice se o nome mudou; as receitas já apontam para o mesmo
+            # objeto, só precisam ser regravadas com o novo nome
             if old_name != nome:
-                self._atualizar_combos_ingredientes(old_name, nome)
+                del self._ingredientes_por_nome[old_name]
+                self._ingredientes_por_nome[ingrediente.nome] = ingrediente  # Chave = nome internado pelo objeto
+                if receitas_afetadas:
+                    self._receitas_alteradas = True
         else:
             # Modo novo ingrediente
             # Verificar se já existe ingrediente com esse nome
-            if any(i.nome == nome for i in self.ingredientes):
+            if nome in self._ingredientes_por_nome:
                 messagebox.showerror("Erro", "Já existe um ingrediente com este nome!")
                 return
                 
             novo_ing = Ingrediente(nome, carb, prot, gord, fibra, sodio)
             self.ingredientes.append(novo_ing)
+            self._ingredientes_por_nome[novo_ing.nome] = novo_ing
         
         # Salvar e atualizar interface
-        DataManager.salvar_ingredientes(self.ingredientes)
+        self._ingredientes_alterados = True
+        self._gravar_alteracoes()
         self._atualizar_combos()
         messagebox.showinfo("Sucesso", "Ingrediente salvo com sucesso!")
         self._novo_ingrediente()
@@ -804,11 +899,30 @@ class NutritionApp(ctk.CTk):
             messagebox.showerror("Erro", "Selecione um ingrediente e digite a quantidade")
             return
         
+        ingrediente = self._ingredientes_por_nome.get(ingrediente_nome)
+        if not ingrediente:
+            messagebox.showerror("Erro", f"Ingrediente não encontrado: {ingrediente_nome}")
+            return
+        
+        try:
+            quantidade = int(quantidade)
+        except ValueError:
+            messagebox.showerror("Erro", "Quantidade deve ser um número inteiro de gramas")
+            return
+        
         # Adicionar à lista
-        self.lista_ingredientes.insert(
-            'end', 
-            f"{ingrediente_nome} - {quantidade}g\n"
-        )
+        self._itens_receita.append((ingrediente, quantidade))
+        self._exibir_itens_receita()
+    
+    def remover_ingrediente_receita(self):
+        ingrediente = self._ingredientes_por_nome.get(self.combo_ingredientes.get())
+        itens = [item for item in self._itens_receita if item[0] is not ingrediente]
+        if len(itens) == len(self._itens_receita):
+            messagebox.showerror("Erro", "Selecione um ingrediente que esteja na receita")
+            return
+        
+        self._itens_receita = itens
+        self._exibir_itens_receita()
     
     def salvar_receita(self):
         try:
@@ -820,34 +934,37 @@ class NutritionApp(ctk.CTk):
             return
 
         nome = self.entry_nome_receita.get()
-        ingredientes_texto = self.lista_ingredientes.get('1.0', 'end').strip()
+        # Itens já validados em adicionar_ingrediente_receita
+        ingredientes = list(self._itens_receita)
 
-        if not nome or not ingredientes_texto:
+        if not nome or not ingredientes:
             messagebox.showerror("Erro", "Preencha todos os campos")
             return
 
-        # Processar ingredientes
-        ingredientes = []
-        for line in ingredientes_texto.split('\n'):
-            if not line:
-                continue
-            try:
-                nome_ing, resto = line.split(' - ')
-                quantidade = int(resto.replace('g', '').strip())
-                ingrediente = next(i for i in self.ingredientes if i.nome == nome_ing)
-                ingredientes.append((ingrediente, quantidade))
-            except Exception as e:
-                messagebox.showerror("Erro", f"Formato inválido na linha: {line}")
-                return
-
         if self.receita_selecionada:
             # Modo edição
+            old_name = self.receita_selecionada.nome
+            if (old_name == nome and self.receita_selecionada.ingredientes == ingredientes
+                    and self.receita_selecionada.rendimento_total == rendimento_total):
+                messagebox.showinfo("OK", "Sem alterações")
+                return
+            
+            if old_name != nome and nome in self._receitas_por_nome:
+                messagebox.showerror("Erro", "Já existe uma receita com este nome!")
+                return
+            
+            self._desindexar_receita(self.receita_selecionada)
             self.receita_selecionada.nome = nome
             self.receita_selecionada.ingredientes = ingredientes
             self.receita_selecionada.rendimento_total = rendimento_total
+            self._indexar_receita(self.receita_selecionada)
+            
+            if old_name != nome:
+                del self._receitas_por_nome[old_name]
+                self._receitas_por_nome[nome] = self.receita_selecionada
         else:
             # Modo nova receita
-            if any(r.nome == nome for r in self.receitas):
+            if nome in self._receitas_por_nome:
                 messagebox.showerror("Erro", "Já existe uma receita com este nome!")
                 return
                 
@@ -857,12 +974,69 @@ class NutritionApp(ctk.CTk):
                 rendimento_total=rendimento_total  # Parâmetro obrigatório
             )
             self.receitas.append(nova_receita)
+            self._receitas_por_nome[nome] = nova_receita
+            self._indexar_receita(nova_receita)
 
-        DataManager.salvar_receitas(self.receitas)
+        self._receitas_alteradas = True
+        self._gravar_alteracoes()
         self._atualizar_combos_receitas()
         messagebox.showinfo("Sucesso", "Receita salva com sucesso!")
         self._nova_receita()
 
+    def _gravar_alteracoes(self):
+        """Agenda a gravação em disco das coleções marcadas como alteradas"""
+        with self._trava_gravacao:
+            # Serializar aqui, na thread da interface: a thread de gravação recebe só
+            # dicionários e nunca lê as listas e objetos que a interface continua alterando
+            if self._ingredientes_alterados:
+                self._gravacao_pendente[DataManager.INGREDIENTES_FILE] = DataManager.serializar(self.ingredientes)
+            if self._receitas_alteradas:
+                self._gravacao_pendente[DataManager.RECEITAS_FILE] = DataManager.serializar(self.receitas)
+            self._ingredientes_alterados = False
+            self._receitas_alteradas = False
+            
+            # Se já há uma gravação na fila, ela levará estas alterações junto
+            if self._gravacao_agendada or not self._gravacao_pendente:
+                return
+            self._gravacao_agendada = True
+        
+        futuro = self._executor_gravacao.submit(self._gravar_pendentes)
+        self._gravacoes.add(futuro)
+        self.after(100, self._verificar_gravacao, futuro)
+
+    def _gravar_pendentes(self):
+        # Executado na thread de gravação
+        with self._trava_gravacao:
+            pendente = self._gravacao_pendente
+            self._gravacao_pendente = {}
+            self._gravacao_agendada = False
+        
+        for caminho, dados in pendente.items():
+            DataManager.gravar_dados(caminho, dados)
+
+    def _verificar_gravacao(self, futuro):
+        # Os erros da thread de gravação são exibidos pela thread da interface
+        if not futuro.done():
+            self.after(100, self._verificar_gravacao, futuro)
+            return
+        
+        self._gravacoes.discard(futuro)
+        self._mostrar_erro_gravacao(futuro)
+
+    @staticmethod
+    def _mostrar_erro_gravacao(futuro):
+        erro = futuro.exception()
+        if erro:
+            messagebox.showerror("Erro", f"Falha ao salvar dados: {str(erro)}")
+
+    def _fechar(self):
+        # Esperar as gravações pendentes e exibir as falhas ainda não verificadas antes de fechar
+        self._executor_gravacao.shutdown(wait=True)
+        for futuro in self._gravacoes:
+            self._mostrar_erro_gravacao(futuro)
+        self._gravacoes.clear()
+        self.destroy()
+
     def _deletar_ingrediente(self):
         nome = self.combo_ingredientes_exist.get()
         if not nome:
@@ -876,19 +1050,24 @@ class NutritionApp(ctk.CTk):
             return
         
         # Remover ingrediente
-        ingrediente = next((i for i in self.ingredientes if i.nome == nome), None)
+        ingrediente = self._ingredientes_por_nome.pop(nome, None)
         if ingrediente:
             self.ingredientes.remove(ingrediente)
+            self._ingredientes_alterados = True
             
-            # Remover de todas as receitas
-            for receita in self.receitas:
+            # Remover das receitas que o usam (comparação por identidade)
+            for receita in self._receitas_por_ingrediente.pop(ingrediente, ()):
                 receita.ingredientes = [
-                    (ing, qtd) for ing, qtd in receita.ingredientes 
-                    if ing.nome != nome
+                    item for item in receita.ingredientes 
+                    if item[0] is not ingrediente
                 ]
+                self._receitas_alteradas = True
             
-            DataManager.salvar_ingredientes(self.ingredientes)
-            DataManager.salvar_receitas(self.receitas)
+            # Tirar também da receita em edição
+            self._itens_receita = [item for item in self._itens_receita if item[0] is not ingrediente]
+            self._exibir_itens_receita()
+            
+            self._gravar_alteracoes()
             self._atualizar_combos()
             self._novo_ingrediente()
             messagebox.showinfo("Sucesso", "Ingrediente excluído com sucesso!")
@@ -906,11 +1085,13 @@ class NutritionApp(ctk.CTk):
             return
         
         # Remover receita
-        receita = next((r for r in self.receitas if r.nome == nome), None)
+        receita = self._receitas_por_nome.pop(nome, None)
         if receita:
             self.receitas.remove(receita)
+            self._desindexar_receita(receita)
             
-            DataManager.salvar_receitas(self.receitas)
+            self._receitas_alteradas = True
+            self._gravar_alteracoes()
             self._atualizar_combos_receitas()
             self._nova_receita()
             messagebox.showinfo("Sucesso", "Receita excluída com sucesso!")
@@ -920,16 +1101,14 @@ class NutritionApp(ctk.CTk):
         receitas_porcoes = []
         peso_total = 0.0
 
-        for frame in self.frame_receitas.winfo_children():
-            children = frame.winfo_children()
-            if len(children) >= 2:
-                nome_receita = children[0].get()
-                quantidade = children[1].get()
-                
-                if nome_receita and quantidade:
-                    receita = next(r for r in self.receitas if r.nome == nome_receita)
-                    peso_total += float(quantidade)  # Calcular peso total
-                    receitas_porcoes.append((receita, float(quantidade)))
+        for combo, entry in self._linhas_porcao:
+            nome_receita = combo.get()
+            quantidade = entry.get()
+            
+            if nome_receita and quantidade:
+                receita = self._receitas_por_nome[nome_receita]
+                peso_total += float(quantidade)  # Calcular peso total
+                receitas_porcoes.append((receita, float(quantidade)))
         
         if not receitas_porcoes:
             messagebox.showerror("Erro", "Adicione pelo menos uma receita")